@@ -0,0 +1,35 @@
+from types import MappingProxyType
+
+# Companies tracked by the backend services (symbol -> display name).
+# gainers, search and volatility all import this so the lists stay in sync;
+# the read-only view stops any one service from mutating the shared table.
+COMPANIES = MappingProxyType({
+    "AAPL": "Apple Inc.",
+    "MSFT": "Microsoft Corporation",
+    "GOOGL": "Alphabet Inc.",
+    "AMZN": "Amazon.com Inc.",
+    "TSLA": "Tesla Inc.",
+    "META": "Meta Platforms Inc.",
+    "NVDA": "NVIDIA Corporation",
+    "JPM": "JPMorgan Chase & Co.",
+    "JNJ": "Johnson & Johnson",
+    "V": "Visa Inc.",
+    "BRK-B": "Berkshire Hathaway Inc.",
+    "UNH": "UnitedHealth Group Incorporated",
+    "XOM": "Exxon Mobil Corporation",
+    "WMT": "Walmart Inc.",
+    "PG": "The Procter & Gamble Company",
+    "RELIANCE.NS": "Reliance Industries Limited",
+    "TCS.NS": "Tata Consultancy Services Limited",
+    "HDFCBANK.NS": "HDFC Bank Limited",
+    "INFY.NS": "Infosys Limited",
+    "ICICIBANK.NS": "ICICI Bank Limited",
+    "ADANIPORTS.NS": "Adani Ports & SEZ",
+    "ASIANPAINT.NS": "Asian Paints Limited",
+    "AXISBANK.NS": "Axis Bank Limited",
+    "MARUTI.NS": "Maruti Suzuki India Limited",
+    "HCLTECH.NS": "HCL Technologies Limited",
+    "KOTAKBANK.NS": "Kotak Mahindra Bank Limited",
+    "LT.NS": "Larsen & Toubro Limited",
+    "INTC": "Intel Corporation"
+})
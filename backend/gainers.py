@@ -1,13 +1,20 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import random
-import heapq
+from fastapi.responses import ORJSONResponse
+import asyncio
+import time
+import logging
 from typing import List
-import yfinance as yf
 import pandas as pd
+import numpy as np
+from companies import COMPANIES
+from market_data import chunked, download_chunk
+
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI application
-app = FastAPI()
+# ORJSONResponse encodes the stock lists in native code instead of the stdlib json module
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Enable CORS for React frontend to allow cross-origin requests
 # This is necessary because frontend runs on port 5173 while backend on 8000
@@ -19,39 +26,44 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
-# List of stock symbols for major companies
-companies = {
-    "AAPL": "Apple Inc.",
-    "MSFT": "Microsoft Corporation",
-    "GOOGL": "Alphabet Inc.",
-    "AMZN": "Amazon.com Inc.",
-    "TSLA": "Tesla Inc.",
-    "META": "Meta Platforms Inc.",
-    "NVDA": "NVIDIA Corporation",
-    "JPM": "JPMorgan Chase & Co.",
-    "JNJ": "Johnson & Johnson",
-    "V": "Visa Inc.",
-    "BRK-B": "Berkshire Hathaway Inc.",
-    "UNH": "UnitedHealth Group Incorporated",
-    "XOM": "Exxon Mobil Corporation",
-    "WMT": "Walmart Inc.",
-    "PG": "The Procter & Gamble Company",
-    "RELIANCE.NS": "Reliance Industries Limited",
-    "TCS.NS": "Tata Consultancy Services Limited",
-    "HDFCBANK.NS": "HDFC Bank Limited",
-    "INFY.NS": "Infosys Limited",
-    "ICICIBANK.NS": "ICICI Bank Limited",
-    "ADANIPORTS.NS": "Adani Ports & SEZ",
-    "ASIANPAINT.NS": "Asian Paints Limited",
-    "AXISBANK.NS": "Axis Bank Limited",
-    "MARUTI.NS": "Maruti Suzuki India Limited",
-    "HCLTECH.NS": "HCL Technologies Limited",
-    "KOTAKBANK.NS": "Kotak Mahindra Bank Limited",
-    "LT.NS": "Larsen & Toubro Limited",
-    "INTC" : "Intel Corporation"
-}
-
-def generate_stock_data():
+def _download_chunks(chunks, period):
+    """
+    Blocking batched downloads, one chunk after another
+    yf.download collects results in module-level state that every call
+    resets, so two calls must never run at the same time
+    """
+    frames = []
+    for chunk in chunks:
+        try:
+            hist = download_chunk(chunk, period)
+        except Exception as e:
+            logger.error("Error fetching data for %s: %s", ", ".join(chunk), e)
+            continue
+        if hist is not None:
+            frames.append(hist)
+    return frames
+
+async def download_history(symbols, period="2d"):
+    """
+    Download recent daily history for many symbols at once
+    Symbols are split into chunks of BATCH_SIZE; each chunk is one batched
+    yf.download call (threaded per ticker by yfinance itself). The chunks run
+    in sequence in a worker thread so the event loop stays free while Yahoo responds
+    Args:
+        symbols: List of stock symbols
+        period: yfinance period string (default "2d")
+    Returns:
+        DataFrame with (symbol, field) MultiIndex columns, empty if nothing was fetched
+    """
+    frames = await asyncio.to_thread(_download_chunks, chunked(symbols), period)
+
+    if not frames:
+        return pd.DataFrame()
+    # Sort explicitly: the union of NSE and US trading dates must be in date
+    # order for the "last valid row is the latest close" logic below
+    return pd.concat(frames, axis=1).sort_index()
+
+async def generate_stock_data():
     """
     Generate real stock data from Yahoo Finance for each company including:
     - Current price from live market data
@@ -59,88 +71,114 @@ def generate_stock_data():
     - Percentage change calculated from actual data
     - Real trading volume from market
     - Actual company name from dictionary
+    All symbols are downloaded in batches and the changes are computed
+    column-wise with NumPy rather than one symbol at a time
     """
+    symbols = list(COMPANIES)
+    hist = await download_history(symbols)
+    if hist.empty:
+        return []
+
+    closes = hist.xs("Close", axis=1, level=1).reindex(columns=symbols).to_numpy(dtype=np.float64)
+    volumes = hist.xs("Volume", axis=1, level=1).reindex(columns=symbols).to_numpy(dtype=np.float64)
+
+    # Markets on different exchanges leave NaN gaps in the shared date index.
+    # A stable sort on the validity mask moves each column's valid rows to the
+    # bottom in date order, so the last two rows of `order` point at the latest
+    # and the previous available close of every symbol.
+    valid = ~np.isnan(closes)
+    counts = valid.sum(axis=0)
+    order = np.argsort(valid, axis=0, kind="stable")
+    columns = np.arange(len(symbols))
+
+    last_close = closes[order[-1], columns]
+    last_volume = np.nan_to_num(volumes[order[-1], columns])
+    current_price = np.round(last_close, 2)
+
+    if len(closes) > 1:
+        # If only one day of data, assume no change
+        previous_close = np.where(counts > 1, closes[order[-2], columns], current_price)
+    else:
+        previous_close = current_price
+
+    price_change = np.round(current_price - previous_close, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent_change = np.round(price_change / previous_close * 100, 2)
+
     stocks = []
-    for symbol, company_name in companies.items():  # Changed to iterate over dictionary items
-        try:
-            # Get stock data from Yahoo Finance
-            ticker = yf.Ticker(symbol)
-            
-            # Get recent price data (last 2 days to calculate change)
-            hist = ticker.history(period="2d")
-            
-            if hist.empty or len(hist) < 1:
-                print(f"No data available for {symbol}, skipping...")
-                continue
-                
-            # Get current price (last available close)
-            current_price = round(float(hist['Close'].iloc[-1]), 2)
-            
-            # Calculate price change from previous day
-            if len(hist) > 1:
-                previous_close = float(hist['Close'].iloc[-2])
-                price_change = round(current_price - previous_close, 2)
-                percent_change = round((price_change / previous_close) * 100, 2)
-            else:
-                # If only one day of data, assume no change
-                price_change = 0.0
-                percent_change = 0.0
-            
-            # Get volume (current day)
-            volume = int(hist['Volume'].iloc[-1])
-            
-            stocks.append({
-                "symbol": symbol,
-                "company_name": company_name,  # Added actual company name
-                "current_price": current_price,
-                "price_change": price_change,
-                "percent_change": percent_change,
-                "volume": volume
-            })
-            
-        except Exception as e:
-            print(f"Error fetching data for {symbol}: {e}")
-            # Skip this stock if there's an error
+    for i, symbol in enumerate(symbols):
+        if counts[i] == 0:
+            logger.warning("No data available for %s, skipping...", symbol)
             continue
-            
+
+        stocks.append({
+            "symbol": symbol,
+            "company_name": COMPANIES[symbol],
+            "current_price": float(current_price[i]),
+            "price_change": float(price_change[i]),
+            "percent_change": float(percent_change[i]),
+            "volume": int(last_volume[i])
+        })
+
     return stocks
-def get_top_gainers(stocks, k=5):
+
+def rank_movers(stocks, k=5):
     """
-    Find top k stocks with highest positive percentage change
-    Uses min-heap to efficiently maintain top k elements
+    Find the top k gainers and the top k losers
+    Two stable argsorts over the percentage changes (n is a few dozen stocks),
+    so ties are always broken by position in `stocks`, earliest first
+    Losers are the k biggest losses
     Args:
         stocks: List of stock dictionaries
-        k: Number of top gainers to return (default 5)
+        k: Number of gainers and losers to return (default 5)
     Returns:
-        Sorted list of top k gainers in descending order
+        Tuple of (gainers in descending order, losers in ascending order),
+        keeping only stocks with positive / negative change respectively
     """
-    gainers_heap = []
-    for i, stock in enumerate(stocks):
-        if stock["percent_change"] > 0:  # Only consider stocks with positive change
-            # Use index as tiebreaker to avoid dict comparison
-            heapq.heappush(gainers_heap, (stock["percent_change"], i, stock))
-            if len(gainers_heap) > k:
-                heapq.heappop(gainers_heap)  # Remove smallest if heap exceeds k
-    return sorted(gainers_heap, reverse=True)  # Sort in descending order
+    n = len(stocks)
+    k = min(k, n)
+    if k == 0:
+        return [], []
 
-def get_top_losers(stocks, k=5):
+    pct = np.fromiter((stock["percent_change"] for stock in stocks), dtype=np.float64, count=n)
+    top = np.argsort(-pct, kind="stable")[:k]
+    bottom = np.argsort(pct, kind="stable")[:k]
+
+    gainers = [stocks[i] for i in top if pct[i] > 0]  # Only positive change
+    losers = [stocks[i] for i in bottom if pct[i] < 0]  # Only negative change, biggest losses first
+    return gainers, losers
+
+# Both endpoints share one snapshot of market data, with gainers and losers
+# already ranked, for _CACHE_TTL seconds so bursts of requests don't
+# re-download the same quotes from Yahoo
+_CACHE_TTL = 30
+TOP_K = 10
+_cache = {"ts": 0.0, "data": None, "gainers": [], "losers": []}
+_cache_lock = asyncio.Lock()
+
+def _cache_fresh():
+    return _cache["data"] is not None and time.monotonic() - _cache["ts"] < _CACHE_TTL
+
+async def get_market_snapshot():
     """
-    Find top k stocks with lowest negative percentage change
-    Uses min-heap to efficiently maintain top k elements
-    Args:
-        stocks: List of stock dictionaries
-        k: Number of top losers to return (default 5)
+    Return the cached market snapshot, refetching and re-ranking once it expires
+    The lock makes the refetch single-flight: concurrent requests wait for the
+    one in progress instead of each downloading the same data
     Returns:
-        Sorted list of top k losers in ascending order
+        Dict with "data" (all stocks), "gainers" and "losers" (top TOP_K each),
+        or None if no stock data could be fetched
     """
-    losers_heap = []
-    for i, stock in enumerate(stocks):
-        if stock["percent_change"] < 0:  # Only consider stocks with negative change
-            # Use index as tiebreaker to avoid dict comparison
-            heapq.heappush(losers_heap, (stock["percent_change"], i, stock))
-            if len(losers_heap) > k:
-                heapq.heappop(losers_heap)  # Remove smallest absolute loss if heap exceeds k
-    return sorted(losers_heap)  # Sort in ascending order (biggest losses first)
+    if _cache_fresh():
+        return _cache
+
+    async with _cache_lock:
+        if not _cache_fresh():
+            stocks = await generate_stock_data()
+            if not stocks:
+                return None  # Don't cache a failed fetch
+            gainers, losers = rank_movers(stocks, k=TOP_K)
+            _cache.update(ts=time.monotonic(), data=stocks, gainers=gainers, losers=losers)
+    return _cache
 
 @app.get("/api/top-gainers")
 async def top_gainers():
@@ -150,14 +188,13 @@ async def top_gainers():
         List of top 10 stocks with highest positive percentage change
     """
     try:
-        stocks = generate_stock_data()
-        if not stocks:
+        snapshot = await get_market_snapshot()
+        if snapshot is None:
             return {"error": "No stock data available", "data": []}
         
-        top_gainers_data = get_top_gainers(stocks, k=10)
-        return [stock for _, _, stock in top_gainers_data]
+        return snapshot["gainers"]
     except Exception as e:
-        print(f"Error in top_gainers endpoint: {e}")
+        logger.exception("Error in top_gainers endpoint: %s", e)
         return {"error": str(e), "data": []}
 
 @app.get("/api/top-losers") 
@@ -168,14 +205,13 @@ async def top_losers():
         List of top 10 stocks with highest negative percentage change
     """
     try:
-        stocks = generate_stock_data()
-        if not stocks:
+        snapshot = await get_market_snapshot()
+        if snapshot is None:
             return {"error": "No stock data available", "data": []}
         
-        top_losers_data = get_top_losers(stocks, k=10)
-        return [stock for _, _, stock in top_losers_data]
+        return snapshot["losers"]
     except Exception as e:
-        print(f"Error in top_losers endpoint: {e}")
+        logger.exception("Error in top_losers endpoint: %s", e)
         return {"error": str(e), "data": []}
 
 @app.get("/")
@@ -185,4 +221,10 @@ async def root():
     Returns:
         Simple message indicating API status
     """
-    return {"message": "Stock API is running!"}
\ No newline at end of file
+    return {"message": "Stock API is running!"}
+
+if __name__ == "__main__":
+    import uvicorn
+    # uvloop and httptools come with uvicorn[standard] and cut event-loop and
+    # HTTP parsing overhead compared to the pure-asyncio defaults
+    uvicorn.run("gainers:app", host="0.0.0.0", port=8000, loop="uvloop", http="httptools", workers=4)
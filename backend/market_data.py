@@ -0,0 +1,104 @@
+import threading
+import time
+import yfinance as yf
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Yahoo Finance access shared by the backend services: one pooled HTTP session,
+# the batched download, per-symbol history and the small TTL cache they all use,
+# so the fetching and caching logic lives in one place instead of being retyped
+# in each service.
+
+# Yahoo serves at most this many symbols per batched download request
+BATCH_SIZE = 20
+
+# One HTTP session shared by every Yahoo call so keep-alive connections are
+# reused instead of paying a new TCP/TLS handshake per request
+session = requests.Session()
+_adapter = HTTPAdapter(
+    # yf.download opens one thread per symbol in a chunk, and search's sync
+    # endpoints run in FastAPI's 40-thread pool
+    pool_maxsize=2 * BATCH_SIZE,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+def get_ticker(symbol):
+    """yf.Ticker whose requests go through the shared session"""
+    return yf.Ticker(symbol, session=session)
+
+# Short-lived caches so repeated lookups of the same symbol skip Yahoo entirely.
+# Insertion-ordered dicts: re-inserting on write keeps the oldest entry first,
+# which is the one dropped once a cache reaches CACHE_MAXSIZE.
+CACHE_MAXSIZE = 512
+_cache_lock = threading.Lock()  # sync endpoints and to_thread work run in worker threads
+
+def cache_get(cache, key, ttl):
+    """Cached value for key if it is younger than ttl seconds, else None"""
+    with _cache_lock:
+        entry = cache.get(key)
+    if entry and time.monotonic() - entry[0] < ttl:
+        return entry[1]
+    return None
+
+def cache_put(cache, key, value):
+    with _cache_lock:
+        cache.pop(key, None)
+        if len(cache) >= CACHE_MAXSIZE:
+            cache.pop(next(iter(cache)))
+        cache[key] = (time.monotonic(), value)
+
+_history_cache = {}  # (symbol, period, interval) -> (timestamp, (history, metadata))
+
+def get_history(symbol, period, ttl, interval="1d"):
+    """
+    Ticker.history for symbol, reused for ttl seconds
+    Returns:
+        Tuple of (history DataFrame, history metadata dict). Both are shared by
+        every caller that hits the cache, so treat them as read-only
+    """
+    key = (symbol, period, interval)
+    cached = cache_get(_history_cache, key, ttl)
+    if cached is not None:
+        return cached
+
+    ticker = get_ticker(symbol)
+    hist = ticker.history(period=period, interval=interval)
+    try:
+        # Chart metadata (currency, trading periods) from the call just made, no extra request
+        metadata = ticker.get_history_metadata()
+    except Exception:
+        metadata = {}
+    if not hist.empty:
+        cache_put(_history_cache, key, (hist, metadata))
+    return hist, metadata
+
+def chunked(symbols):
+    """Split symbols into lists of at most BATCH_SIZE, one per batched download"""
+    return [symbols[i:i + BATCH_SIZE] for i in range(0, len(symbols), BATCH_SIZE)]
+
+# yf.download collects results in module-level state (shared._DFS) that every
+# call resets, so overlapping calls mix up each other's tickers. Concurrent
+# requests and search's background warm-up all go through this lock.
+_download_lock = threading.Lock()
+
+def download_chunk(chunk, period):
+    """
+    Blocking batched download of daily history for at most BATCH_SIZE symbols
+    Returns:
+        DataFrame with (symbol, field) MultiIndex columns, or None if nothing came back
+    """
+    # auto_adjust=True keeps the same adjusted prices Ticker.history returns
+    with _download_lock:
+        hist = yf.download(chunk, period=period, group_by="ticker", threads=True,
+                           progress=False, auto_adjust=True, session=session)
+    if hist.empty:
+        return None
+
+    # A single-symbol chunk comes back with flat columns
+    if not isinstance(hist.columns, pd.MultiIndex):
+        hist.columns = pd.MultiIndex.from_product([chunk, hist.columns])
+    return hist
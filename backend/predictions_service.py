@@ -1,17 +1,28 @@
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import List, Optional
-import yfinance as yf
+import asyncio
 import numpy as np
-from datetime import datetime
-import statistics
+import pandas as pd
+import time
+from functools import lru_cache
+import logging
+import math
+import os
 import uvicorn
+from market_data import get_history
+
+# Per-request analysis details are logged at DEBUG so nothing is formatted
+# unless DEBUG is enabled; the root logger is configured in __main__
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Stock Prediction API",
     description="Pure data-driven stock prediction using technical indicators",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # Faster encoding of the large prediction payloads
 )
 
 # CORS middleware
@@ -65,39 +76,131 @@ class CompareResponse(BaseModel):
     confidence: float
     predicted_change: float
 
+def _ema_series(prices: np.ndarray, period: int) -> np.ndarray:
+    """
+    Exponential Moving Average at every point from index period-1 onwards
+
+    Seeded with the SMA of the first `period` prices, then the single-pole
+    recurrence ema = price * m + ema * (1 - m) runs in pandas' compiled ewm
+    instead of a Python loop. Element j is the EMA of prices[:period + j].
+    """
+    seeded = np.concatenate(([prices[:period].mean()], prices[period:]))
+    return pd.Series(seeded).ewm(alpha=2 / (period + 1), adjust=False).mean().to_numpy()
+
+# One PCG64 generator per process for the prediction noise
+_rng = np.random.default_rng()
+
+# Centered day offsets for the 20-day trend regression and their sum of squares (665)
+_TREND_X = np.arange(20) - 9.5
+_TREND_SXX = float(_TREND_X @ _TREND_X)
+
+# Signal bands for the prediction score. HOLD covers [-0.5, 0.5] inclusive, so the
+# two negative cut points are nudged down one ulp for searchsorted(side="left")
+_SIGNAL_THRESHOLDS = np.array([np.nextafter(-1.5, -np.inf), np.nextafter(-0.5, -np.inf), 0.5, 1.5])
+_SIGNAL_LABELS = ("STRONG SELL", "SELL", "HOLD", "BUY", "STRONG BUY")
+_CONF_BASE = np.array([55, 50, 50, 50, 55])
+_CONF_MULT = np.array([10, 8, 5, 8, 10])
+_CONF_CAP = np.array([85, 75, np.inf, 75, 85])
+
+# (predicate, template) pairs for generate_analysis, in output order. Predicates
+# within a group are mutually exclusive, mirroring the original if/elif chains
+_ANALYSIS_RULES = (
+    # RSI Analysis
+    (lambda s: s['rsi'] < 30, "Stock is oversold (RSI: {rsi:.1f}). This often signals a potential buying opportunity as selling pressure may be exhausted."),
+    (lambda s: s['rsi'] > 70, "Stock is overbought (RSI: {rsi:.1f}). This suggests the stock may be due for a price correction or consolidation."),
+    (lambda s: 30 <= s['rsi'] <= 70, "RSI at {rsi:.1f} indicates neutral territory. The stock is neither overbought nor oversold."),
+    
+    # Trend Analysis
+    (lambda s: s['trend_score'] >= 3, "Strong bullish trend confirmed across multiple moving averages. Momentum is on the upside."),
+    (lambda s: s['trend_score'] <= -3, "Strong bearish trend detected. Multiple moving averages suggest downward momentum."),
+    (lambda s: 0 < s['trend_score'] < 3, "Mild bullish bias detected, but trend is not strongly confirmed."),
+    (lambda s: -3 < s['trend_score'] < 0, "Mild bearish bias detected, but trend is not strongly confirmed."),
+    (lambda s: s['trend_score'] == 0, "Stock is in consolidation. No clear directional trend in moving averages."),
+    
+    # Momentum Analysis
+    (lambda s: s['momentum'] > 5, "Strong positive momentum ({momentum:.1f}%) suggests continued upward price action in the near term."),
+    (lambda s: s['momentum'] < -5, "Strong negative momentum ({momentum:.1f}%) indicates bearish pressure and potential further decline."),
+    (lambda s: abs(s['momentum']) < 2, "Low momentum suggests the stock is range-bound or consolidating."),
+    
+    # Volume Analysis
+    (lambda s: s['volume_trend'] > 30, "Significantly higher trading volume confirms strong market interest and validates current price movement."),
+    (lambda s: s['volume_trend'] < -30, "Lower trading volume suggests weak conviction in the current trend. Be cautious of potential reversals."),
+    
+    # Volatility Warning
+    (lambda s: s['volatility'] > 5, "High volatility ({volatility:.1f}%) detected. Expect larger price swings and increased risk."),
+    (lambda s: s['volatility'] < 1.5, "Low volatility indicates stable, predictable price action with reduced risk."),
+    
+    # MACD insight
+    (lambda s: s['macd_histogram'] > 0.5, "MACD shows bullish momentum building. The trend is strengthening to the upside."),
+    (lambda s: s['macd_histogram'] < -0.5, "MACD shows bearish momentum. Selling pressure is increasing."),
+)
+
+# How long fetched history and the predictions built on it are reused
+_CACHE_TTL = 15 * 60
+
+def _cache_window() -> int:
+    """Index of the current _CACHE_TTL-long time window, used as a cache key"""
+    return int(time.time() // _CACHE_TTL)
+
+@lru_cache(maxsize=128)
+def _fetch_history(symbol: str, window: int) -> tuple:
+    """
+    One year of daily closes, volumes and dates for `symbol`
+
+    `window` (see _cache_window) only keys the cache, so each symbol is
+    downloaded from Yahoo at most once per _CACHE_TTL seconds. Raises LookupError when no data comes back so that a
+    failed fetch is retried on the next request instead of being cached.
+    """
+    # Through the shared session, so the fetch gets its connection pooling and retries
+    hist, _ = get_history(symbol, "1y", _CACHE_TTL)
+    prices = hist['Close'].to_numpy(dtype=np.float64)
+    volumes = hist['Volume'].fillna(0).to_numpy(dtype=np.int64)
+    dates = hist.index
+    
+    if len(prices) == 0:
+        raise LookupError(f"No data found for {symbol}")
+    
+    # The arrays are shared by every request that hits the cache
+    prices.flags.writeable = False
+    volumes.flags.writeable = False
+    return prices, volumes, dates
+
 class StockPredictor:
     """Pure data-driven stock prediction using statistical methods"""
     
-    def __init__(self):
-        self.cache = {}
-    
-    def calculate_sma(self, prices: List[float], period: int) -> Optional[float]:
-        """Simple Moving Average"""
+    def calculate_sma(self, prices: np.ndarray, period: int,
+                      cumsum: Optional[np.ndarray] = None) -> Optional[float]:
+        """
+        Simple Moving Average
+        
+        Pass `cumsum` (prefix sums with a leading 0, see prefix_sums) to get
+        any window in O(1) instead of re-summing the tail for every period.
+        """
         if len(prices) < period:
             return None
-        return sum(prices[-period:]) / period
+        if cumsum is not None:
+            return float((cumsum[-1] - cumsum[-period - 1]) / period)
+        return float(prices[-period:].mean())
+    
+    def prefix_sums(self, prices: np.ndarray) -> np.ndarray:
+        """Cumulative sums of prices with a leading 0, computed once per prediction"""
+        return np.concatenate(([0.0], np.cumsum(prices)))
     
-    def calculate_ema(self, prices: List[float], period: int) -> Optional[float]:
+    def calculate_ema(self, prices: np.ndarray, period: int) -> Optional[float]:
         """Exponential Moving Average"""
         if len(prices) < period:
             return None
-        multiplier = 2 / (period + 1)
-        ema = sum(prices[:period]) / period
-        for price in prices[period:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        return ema
+        return float(_ema_series(prices, period)[-1])
     
-    def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
+    def calculate_rsi(self, prices: np.ndarray, period: int = 14) -> float:
         """Relative Strength Index"""
         if len(prices) < period + 1:
             return 50
         
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas[-period:]]
-        losses = [-d if d < 0 else 0 for d in deltas[-period:]]
-        
-        avg_gain = sum(gains) / period
-        avg_loss = sum(losses) / period
+        # Only the last `period` deltas feed the averages
+        deltas = np.diff(prices[-(period + 1):])
+        avg_gain = float(np.maximum(deltas, 0).mean())
+        avg_loss = float(np.maximum(-deltas, 0).mean())
         
         if avg_loss == 0:
             return 100
@@ -106,120 +209,124 @@ class StockPredictor:
         rsi = 100 - (100 / (1 + rs))
         return rsi
     
-    def calculate_momentum(self, prices: List[float], period: int = 10) -> float:
+    def calculate_momentum(self, prices: np.ndarray, period: int = 10) -> float:
         """Price Momentum"""
         if len(prices) < period:
             return 0
-        return ((prices[-1] - prices[-period]) / prices[-period]) * 100
+        return float((prices[-1] - prices[-period]) / prices[-period] * 100)
     
-    def calculate_volatility(self, prices: List[float], period: int = 20) -> float:
+    def calculate_volatility(self, prices: np.ndarray, period: int = 20) -> float:
         """Historical Volatility (Standard Deviation)"""
         if len(prices) < period:
             return 0
-        returns = [(prices[i] - prices[i-1]) / prices[i-1] for i in range(-period+1, 0)]
+        window = prices[-period:]
+        returns = np.diff(window) / window[:-1]
         if len(returns) <= 1:
             return 0
-        return statistics.stdev(returns) * 100
+        return float(returns.std(ddof=1) * 100)
     
-    def calculate_macd(self, prices: List[float]) -> tuple:
+    def calculate_macd(self, prices: np.ndarray) -> tuple:
         """Moving Average Convergence Divergence"""
         if len(prices) < 26:
             return 0, 0, 0
         
-        ema_12 = self.calculate_ema(prices, 12)
-        ema_26 = self.calculate_ema(prices, 26)
-        
-        if ema_12 is None or ema_26 is None:
-            return 0, 0, 0
-        
-        macd_line = ema_12 - ema_26
+        # Full EMA series in one pass each; ema_12[i] lines up with prices[i + 11]
+        # and ema_26[i] with prices[i + 25], so both are aligned from index 25 on
+        ema_12 = _ema_series(prices, 12)
+        ema_26 = _ema_series(prices, 26)
+        macd_series = ema_12[14:] - ema_26
         
-        # Calculate signal line (9-day EMA of MACD)
-        macd_values = []
-        for i in range(26, len(prices)):
-            temp_ema12 = self.calculate_ema(prices[:i+1], 12)
-            temp_ema26 = self.calculate_ema(prices[:i+1], 26)
-            if temp_ema12 and temp_ema26:
-                macd_values.append(temp_ema12 - temp_ema26)
+        macd_line = float(macd_series[-1])
         
-        signal_line = self.calculate_ema(macd_values, 9) if len(macd_values) >= 9 else 0
+        # Calculate signal line (9-day EMA of MACD values from day 26 onwards)
+        macd_values = macd_series[1:]
+        signal_line = float(_ema_series(macd_values, 9)[-1]) if len(macd_values) >= 9 else 0
         histogram = macd_line - signal_line if signal_line else 0
         
         return macd_line, signal_line, histogram
     
-    def calculate_bollinger_bands(self, prices: List[float], period: int = 20) -> tuple:
+    def calculate_bollinger_bands(self, prices: np.ndarray, period: int = 20,
+                                  cumsum: Optional[np.ndarray] = None) -> tuple:
         """Bollinger Bands"""
         if len(prices) < period:
             return None, None, None
         
-        sma = self.calculate_sma(prices, period)
+        sma = self.calculate_sma(prices, period, cumsum)
         if sma is None:
             return None, None, None
         
-        recent_prices = prices[-period:]
-        std_dev = statistics.stdev(recent_prices)
+        std_dev = float(prices[-period:].std(ddof=1))
         
         upper_band = sma + (2 * std_dev)
         lower_band = sma - (2 * std_dev)
         
         return upper_band, sma, lower_band
     
-    def detect_support_resistance(self, prices: List[float], window: int = 20):
+    def detect_support_resistance(self, prices: np.ndarray, window: int = 20):
         """Identify support and resistance levels"""
         if len(prices) < window:
             return None, None
         
         recent = prices[-window:]
-        support = min(recent)
-        resistance = max(recent)
-        return support, resistance
+        return float(recent.min()), float(recent.max())
     
-    def calculate_trend_strength(self, prices: List[float]) -> float:
+    def calculate_trend_strength(self, prices: np.ndarray) -> float:
         """Calculate trend strength using linear regression"""
         if len(prices) < 20:
             return 0
         
-        recent_prices = prices[-20:]
-        x = np.arange(len(recent_prices))
-        y = np.array(recent_prices)
+        y = prices[-20:]
         
-        # Linear regression
-        coeffs = np.polyfit(x, y, 1)
-        slope = coeffs[0]
+        # Closed-form least-squares slope over x = 0..19; with x centered the
+        # cross term reduces to a dot product over a constant denominator
+        slope = float(_TREND_X @ y) / _TREND_SXX
         
         # Normalize slope by price level
-        avg_price = np.mean(y)
+        avg_price = float(y.mean())
         normalized_slope = (slope / avg_price) * 100
         
         return normalized_slope
     
     def predict_price(self, symbol: str, days_ahead: int = 5) -> Optional[PredictionResponse]:
+        """Prediction for `symbol`, memoized for _CACHE_TTL seconds"""
+        try:
+            return self._predict_cached(symbol, days_ahead, _cache_window())
+        except LookupError:
+            return None
+    
+    @lru_cache(maxsize=256)
+    def _predict_cached(self, symbol: str, days_ahead: int, window: int) -> PredictionResponse:
+        """
+        Cached wrapper around build_prediction keyed on (symbol, days_ahead, window),
+        so repeat requests within a cache window skip both the fetch and the indicator math.
+        Failures raise LookupError, which lru_cache never stores.
+        """
+        result = self.build_prediction(symbol, days_ahead, window)
+        if result is None:
+            raise LookupError(symbol)
+        return result
+    
+    def build_prediction(self, symbol: str, days_ahead: int, window: int) -> Optional[PredictionResponse]:
         """Main prediction logic using pure data insights"""
         try:
-            print(f"\n{'='*50}")
-            print(f"Analyzing {symbol}...")
-            print(f"{'='*50}")
-            
-            # Fetch historical data
-            stock = yf.Ticker(symbol)
-            hist = stock.history(period="1y")
+            logger.debug("Analyzing %s...", symbol)
             
-            if hist.empty:
-                print(f"❌ No data found for {symbol}")
+            # Fetch historical data (cached for the window)
+            try:
+                prices, volumes, dates = _fetch_history(symbol, window)
+            except LookupError:
+                logger.warning("No data found for %s", symbol)
                 return None
             
-            prices = hist['Close'].tolist()
-            volumes = hist['Volume'].tolist()
-            dates = hist.index.tolist()
-            
-            current_price = prices[-1]
-            print(f"📊 Current Price: ${current_price:.2f}")
-            print(f"📅 Data Points: {len(prices)} days")
+            current_price = float(prices[-1])
+            logger.debug("Current Price: $%.2f", current_price)
+            logger.debug("Data Points: %d days", len(prices))
             
             # Calculate all indicators
-            sma_20 = self.calculate_sma(prices, 20)
-            sma_50 = self.calculate_sma(prices, 50)
-            sma_200 = self.calculate_sma(prices, 200)
+            cumsum = self.prefix_sums(prices)
+            sma_20 = self.calculate_sma(prices, 20, cumsum)
+            sma_50 = self.calculate_sma(prices, 50, cumsum)
+            sma_200 = self.calculate_sma(prices, 200, cumsum)
             ema_20 = self.calculate_ema(prices, 20)
             rsi = self.calculate_rsi(prices)
             momentum = self.calculate_momentum(prices, 10)
@@ -227,23 +334,21 @@ class StockPredictor:
             volatility = self.calculate_volatility(prices)
             
             macd_line, signal_line, macd_histogram = self.calculate_macd(prices)
-            upper_bb, middle_bb, lower_bb = self.calculate_bollinger_bands(prices)
+            upper_bb, middle_bb, lower_bb = self.calculate_bollinger_bands(prices, cumsum=cumsum)
             support, resistance = self.detect_support_resistance(prices)
             trend_strength = self.calculate_trend_strength(prices)
             
             # Volume analysis
-            avg_volume = sum(volumes[-20:]) / 20 if len(volumes) >= 20 else sum(volumes) / len(volumes)
-            volume_trend = (volumes[-1] - avg_volume) / avg_volume * 100
+            avg_volume = volumes[-20:].mean()
+            # Zero-volume symbols (FX pairs, some indices) have no volume trend
+            volume_trend = (volumes[-1] - avg_volume) / avg_volume * 100 if avg_volume > 0 else 0.0
             
             # Recent price action (last 5 days)
             recent_change = ((prices[-1] - prices[-5]) / prices[-5]) * 100 if len(prices) >= 5 else 0
             
-            print(f"\n📈 Technical Indicators:")
-            print(f"  RSI: {rsi:.2f}")
-            print(f"  Momentum (10d): {momentum:.2f}%")
-            print(f"  Volatility: {volatility:.2f}%")
-            print(f"  Trend Strength: {trend_strength:.2f}")
-            print(f"  Volume Trend: {volume_trend:.2f}%")
+            logger.debug("Technical Indicators: RSI %.2f, Momentum (10d) %.2f%%, Volatility %.2f%%, "
+                         "Trend Strength %.2f, Volume Trend %.2f%%",
+                         rsi, momentum, volatility, trend_strength, volume_trend)
             
             # Build prediction based on multiple factors
             prediction_components = {}
@@ -265,11 +370,11 @@ class StockPredictor:
             ma_signal = 0
             if sma_20 and sma_50:
                 crossover_strength = ((sma_20 - sma_50) / sma_50) * 100
-                ma_signal = np.tanh(crossover_strength / 2) * 3
+                ma_signal = math.tanh(crossover_strength / 2) * 3
             prediction_components['ma_crossover'] = ma_signal * 0.25
             
             # 3. Momentum (20% weight)
-            momentum_signal = np.tanh(momentum / 10) * 3
+            momentum_signal = math.tanh(momentum / 10) * 3
             prediction_components['momentum'] = momentum_signal * 0.20
             
             # 4. MACD Signal (15% weight)
@@ -293,10 +398,8 @@ class StockPredictor:
             # Calculate total prediction score
             prediction_score = sum(prediction_components.values())
             
-            print(f"\n🎯 Prediction Components:")
-            for component, value in prediction_components.items():
-                print(f"  {component}: {value:+.3f}")
-            print(f"  TOTAL SCORE: {prediction_score:+.3f}")
+            logger.debug("Prediction Components: %s, TOTAL SCORE: %+.3f",
+                         prediction_components, prediction_score)
             
             # Convert to percentage change - use volatility as base
             # Higher volatility = larger potential moves
@@ -308,52 +411,32 @@ class StockPredictor:
             # Calculate daily change rate
             daily_change_rate = (base_change + momentum_influence) / days_ahead
             
-            print(f"\n📊 Prediction Metrics:")
-            print(f"  Base Change: {base_change:.3f}%")
-            print(f"  Daily Rate: {daily_change_rate:.3f}%")
+            logger.debug("Prediction Metrics: Base Change %.3f%%, Daily Rate %.3f%%",
+                         base_change, daily_change_rate)
             
-            # Generate predictions with compound effect
-            predictions = []
-            cumulative_change = 0
+            # Generate predictions with compound effect, all days at once
+            days = np.arange(1, days_ahead + 1)
             
-            for day in range(1, days_ahead + 1):
-                # Add some randomness based on volatility (±20% of daily change)
-                random_factor = np.random.uniform(-0.2, 0.2) * volatility * 0.1
-                
-                # Progressive change with slight acceleration/deceleration
-                day_factor = 1 + (day / days_ahead) * 0.2  # Days further out have slightly more movement
-                
-                day_change = daily_change_rate * day_factor + random_factor
-                cumulative_change += day_change
-                
-                predicted_price = current_price * (1 + cumulative_change / 100)
-                
-                predictions.append(Prediction(
-                    day=day,
-                    price=round(predicted_price, 2),
-                    change_pct=round(cumulative_change, 2)
-                ))
-                
-                print(f"  Day {day}: ${predicted_price:.2f} ({cumulative_change:+.2f}%)")
+            # Add some randomness based on volatility (±20% of daily change)
+            random_factor = _rng.uniform(-0.2, 0.2, days_ahead) * volatility * 0.1
             
-            # Determine signal and confidence
-            abs_score = abs(prediction_score)
+            # Progressive change with slight acceleration/deceleration
+            day_factor = 1 + (days / days_ahead) * 0.2  # Days further out have slightly more movement
             
-            if prediction_score > 1.5:
-                signal = "STRONG BUY"
-                confidence = min(85, 55 + abs_score * 10)
-            elif prediction_score > 0.5:
-                signal = "BUY"
-                confidence = min(75, 50 + abs_score * 8)
-            elif prediction_score < -1.5:
-                signal = "STRONG SELL"
-                confidence = min(85, 55 + abs_score * 10)
-            elif prediction_score < -0.5:
-                signal = "SELL"
-                confidence = min(75, 50 + abs_score * 8)
-            else:
-                signal = "HOLD"
-                confidence = 50 + abs_score * 5
+            cumulative_change = np.cumsum(daily_change_rate * day_factor + random_factor)
+            predicted_prices = current_price * (1 + cumulative_change / 100)
+            
+            predictions = [
+                Prediction.model_construct(day=d, price=round(price, 2), change_pct=round(change, 2))
+                for d, price, change in zip(days.tolist(), predicted_prices.tolist(), cumulative_change.tolist())
+            ]
+            logger.debug("Predicted prices: %s", predictions)
+            
+            # Determine signal and confidence from the score's band
+            abs_score = abs(prediction_score)
+            band = int(np.searchsorted(_SIGNAL_THRESHOLDS, prediction_score))
+            signal = _SIGNAL_LABELS[band]
+            confidence = float(min(_CONF_CAP[band], _CONF_BASE[band] + abs_score * _CONF_MULT[band]))
             
             # Adjust confidence based on volatility (high volatility = lower confidence)
             if volatility > 5:
@@ -361,7 +444,7 @@ class StockPredictor:
             elif volatility > 3:
                 confidence *= 0.92
             
-            print(f"\n✅ Signal: {signal} (Confidence: {confidence:.1f}%)")
+            logger.debug("Signal: %s (Confidence: %.1f%%)", signal, confidence)
             
             # Calculate trend score for display
             trend_score = 0
@@ -371,13 +454,15 @@ class StockPredictor:
             if sma_20 and sma_50: trend_score += 1 if sma_20 > sma_50 else -1
             if sma_50 and sma_200: trend_score += 1 if sma_50 > sma_200 else -1
             
-            return PredictionResponse(
+            # Every field is produced above with the right type, so skip
+            # Pydantic's per-field validation when building the response
+            return PredictionResponse.model_construct(
                 symbol=symbol,
                 current_price=round(current_price, 2),
                 predictions=predictions,
                 signal=signal,
                 confidence=round(confidence, 1),
-                indicators=Indicators(
+                indicators=Indicators.model_construct(
                     sma_20=round(sma_20, 2) if sma_20 else None,
                     sma_50=round(sma_50, 2) if sma_50 else None,
                     ema_20=round(ema_20, 2) if ema_20 else None,
@@ -389,74 +474,29 @@ class StockPredictor:
                     resistance=round(resistance, 2) if resistance else None,
                     volume_trend=round(volume_trend, 2)
                 ),
-                historical_data=HistoricalData(
-                    dates=[d.strftime('%Y-%m-%d') for d in dates[-60:]],
-                    prices=[round(p, 2) for p in prices[-60:]],
-                    volumes=[int(v) for v in volumes[-60:]]
+                # Whole-array rounding/formatting, one tolist() each; dates are
+                # made tz-naive first so the day is the exchange's local date
+                historical_data=HistoricalData.model_construct(
+                    dates=np.datetime_as_string(dates[-60:].tz_localize(None).to_numpy(), unit='D').tolist(),
+                    prices=np.round(prices[-60:], 2).tolist(),
+                    volumes=volumes[-60:].tolist()
                 ),
                 analysis=self.generate_analysis(rsi, momentum, trend_score, volume_trend, 
                                                 prediction_score, volatility, macd_histogram)
             )
             
         except Exception as e:
-            print(f"❌ Error predicting {symbol}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error predicting %s: %s", symbol, e)
             return None
     
     def generate_analysis(self, rsi: float, momentum: float, trend_score: int, 
                          volume_trend: float, prediction_score: float, 
                          volatility: float, macd_histogram: float) -> List[str]:
         """Generate human-readable analysis"""
-        analysis = []
-        
-        # RSI Analysis
-        if rsi < 30:
-            analysis.append(f"Stock is oversold (RSI: {rsi:.1f}). This often signals a potential buying opportunity as selling pressure may be exhausted.")
-        elif rsi > 70:
-            analysis.append(f"Stock is overbought (RSI: {rsi:.1f}). This suggests the stock may be due for a price correction or consolidation.")
-        else:
-            analysis.append(f"RSI at {rsi:.1f} indicates neutral territory. The stock is neither overbought nor oversold.")
-
-        # Trend Analysis
-        if trend_score >= 3:
-            analysis.append("Strong bullish trend confirmed across multiple moving averages. Momentum is on the upside.")
-        elif trend_score <= -3:
-            analysis.append("Strong bearish trend detected. Multiple moving averages suggest downward momentum.")
-        elif trend_score > 0:
-            analysis.append("Mild bullish bias detected, but trend is not strongly confirmed.")
-        elif trend_score < 0:
-            analysis.append("Mild bearish bias detected, but trend is not strongly confirmed.")
-        else:
-            analysis.append("Stock is in consolidation. No clear directional trend in moving averages.")
-
-        # Momentum Analysis
-        if momentum > 5:
-            analysis.append(f"Strong positive momentum ({momentum:.1f}%) suggests continued upward price action in the near term.")
-        elif momentum < -5:
-            analysis.append(f"Strong negative momentum ({momentum:.1f}%) indicates bearish pressure and potential further decline.")
-        elif abs(momentum) < 2:
-            analysis.append("Low momentum suggests the stock is range-bound or consolidating.")
-
-        # Volume Analysis
-        if volume_trend > 30:
-            analysis.append("Significantly higher trading volume confirms strong market interest and validates current price movement.")
-        elif volume_trend < -30:
-            analysis.append("Lower trading volume suggests weak conviction in the current trend. Be cautious of potential reversals.")
-        
-        # Volatility Warning
-        if volatility > 5:
-            analysis.append(f"High volatility ({volatility:.1f}%) detected. Expect larger price swings and increased risk.")
-        elif volatility < 1.5:
-            analysis.append("Low volatility indicates stable, predictable price action with reduced risk.")
-
-        # MACD insight
-        if macd_histogram > 0.5:
-            analysis.append("MACD shows bullish momentum building. The trend is strengthening to the upside.")
-        elif macd_histogram < -0.5:
-            analysis.append("MACD shows bearish momentum. Selling pressure is increasing.")
-        
-        return analysis
+        s = {'rsi': rsi, 'momentum': momentum, 'trend_score': trend_score,
+             'volume_trend': volume_trend, 'volatility': volatility,
+             'macd_histogram': macd_histogram}
+        return [template.format(**s) for applies, template in _ANALYSIS_RULES if applies(s)]
 
 # Initialize predictor
 predictor = StockPredictor()
@@ -494,7 +534,9 @@ async def predict(
     """
     symbol = symbol.upper()
     
-    result = predictor.predict_price(symbol, days)
+    # predict_price blocks on the yfinance fetch and the indicator math, so run
+    # it in a worker thread to keep the event loop free for other requests
+    result = await asyncio.to_thread(predictor.predict_price, symbol, days)
     
     if result is None:
         raise HTTPException(
@@ -511,14 +553,18 @@ async def compare_stocks(request: CompareRequest):
     
     - **symbols**: List of stock symbols to compare (max 5)
     """
-    symbols = request.symbols[:5]
+    symbols = [symbol.upper() for symbol in request.symbols[:5]]
+    
+    # Fetch and analyse all symbols concurrently in worker threads
+    predictions = await asyncio.gather(
+        *(asyncio.to_thread(predictor.predict_price, symbol, 5) for symbol in symbols)
+    )
     
     results = []
-    for symbol in symbols:
-        prediction = predictor.predict_price(symbol.upper(), 5)
+    for symbol, prediction in zip(symbols, predictions):
         if prediction:
-            results.append(CompareResponse(
-                symbol=symbol.upper(),
+            results.append(CompareResponse.model_construct(
+                symbol=symbol,
                 signal=prediction.signal,
                 confidence=prediction.confidence,
                 predicted_change=prediction.predictions[-1].change_pct
@@ -532,20 +578,28 @@ async def compare_stocks(request: CompareRequest):
     
     return results
 
+# The frontend's Predictions tab calls this port; gainers already runs on 8000
+PORT = 8002
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     print("\n" + "="*60)
     print("🚀 Stock Prediction FastAPI Server v2.0 Starting...")
     print("="*60)
-    print(f"📊 Server: http://localhost:8000")
-    print(f"📚 API Docs: http://localhost:8000/docs")
-    print(f"🔗 Health: http://localhost:8000/api/health")
-    print(f"📈 Example: http://localhost:8000/api/predict?symbol=AAPL&days=5")
+    print(f"📊 Server: http://localhost:{PORT}")
+    print(f"📚 API Docs: http://localhost:{PORT}/docs")
+    print(f"🔗 Health: http://localhost:{PORT}/api/health")
+    print(f"📈 Example: http://localhost:{PORT}/api/predict?symbol=AAPL&days=5")
     print("="*60 + "\n")
     
+    # Production runs one worker process per core (override with WORKERS);
+    # DEV=1 switches to a single auto-reloading process for local development
     uvicorn.run(
-        "prediction_service:app",
+        "predictions_service:app",
         host="0.0.0.0",
-        port=8000,
-        reload=True,
+        port=PORT,
+        workers=int(os.environ.get("WORKERS", os.cpu_count())),
+        reload=os.environ.get("DEV") == "1",
         log_level="info"
     )
\ No newline at end of file
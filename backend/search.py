@@ -1,70 +1,38 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
-import pandas as pd
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import numpy as np
+import orjson
 from datetime import datetime
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+import asyncio
+import math
+import threading
+import time
+import logging
+from companies import COMPANIES
+from market_data import cache_get, cache_put, chunked, download_chunk, get_history, get_ticker
 
-app = FastAPI()
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep the default charts that are in demand warm while the app runs
+    task = asyncio.create_task(warm_chart_cache())
+    yield
+    task.cancel()
+
+# ORJSONResponse encodes the large chart payloads in native code instead of the stdlib json module
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # This search API allows users to search for companies and get live stock data with timeframe support.
 # To do this, we employ different data structures for efficiency:
-# 1. Trie (Prefix Tree) for efficient prefix-based search with O(m) lookup where m is the query length.
-# 2. Hash Map (Dictionary) for company symbol to name mapping for O(1) lookups.
+# 1. Sorted list + binary search (bisect) for prefix-based search in O(log n + k) for k matches.
+# 2. Hash Map (Dictionary, shared via companies.py) for company symbol to name mapping for O(1) lookups.
 # 3. Hash Map is also used in the response to store stock data for quick access.
 # 4. Lists for storing chart data points, which are efficient for iteration and appending.
 
-class TrieNode:
-    def __init__(self):
-        self.children = {}
-        self.is_end_of_word = False
-        self.data = None  # Stores (symbol, company_name) tuple
-
-class Trie:
-    def __init__(self):
-        self.root = TrieNode()
-    
-    def insert(self, word, symbol, company_name):
-        """Insert a word (symbol or company name) into the Trie"""
-        node = self.root
-        word = word.lower()
-        
-        for char in word:
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
-        
-        node.is_end_of_word = True
-        node.data = (symbol, company_name)
-    
-    def search_prefix(self, prefix):
-        """Search for all words with the given prefix"""
-        results = []
-        node = self.root
-        prefix = prefix.lower()
-        
-        # Navigate to the prefix node
-        for char in prefix:
-            if char not in node.children:
-                return results
-            node = node.children[char]
-        
-        # Collect all words with this prefix
-        self._collect_all_words(node, results)
-        return results
-    
-    def _collect_all_words(self, node, results):
-        """Helper method to collect all words from a given node"""
-        if node.is_end_of_word and node.data:
-            symbol, company_name = node.data
-            if (symbol, company_name) not in [(r["symbol"], r["company"]) for r in results]:
-                results.append({
-                    "symbol": symbol,
-                    "company": company_name
-                })
-        
-        for child in node.children.values():
-            self._collect_all_words(child, results)
-
 # Allow React frontend to access FastAPI
 app.add_middleware(
     CORSMiddleware,
@@ -73,117 +41,195 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Hash map for companies (single source of truth)
-companies = {
-    "AAPL": "Apple Inc.",
-    "MSFT": "Microsoft Corporation",
-    "GOOGL": "Alphabet Inc.",
-    "AMZN": "Amazon.com Inc.",
-    "TSLA": "Tesla Inc.",
-    "META": "Meta Platforms Inc.",
-    "NVDA": "NVIDIA Corporation",
-    "JPM": "JPMorgan Chase & Co.",
-    "JNJ": "Johnson & Johnson",
-    "V": "Visa Inc.",
-    "BRK-B": "Berkshire Hathaway Inc.",
-    "UNH": "UnitedHealth Group Incorporated",
-    "XOM": "Exxon Mobil Corporation",
-    "WMT": "Walmart Inc.",
-    "PG": "The Procter & Gamble Company",
-    "RELIANCE.NS": "Reliance Industries Limited",
-    "TCS.NS": "Tata Consultancy Services Limited",
-    "HDFCBANK.NS": "HDFC Bank Limited",
-    "INFY.NS": "Infosys Limited",
-    "ICICIBANK.NS": "ICICI Bank Limited",
-    "ADANIPORTS.NS": "Adani Ports & SEZ",
-    "ASIANPAINT.NS": "Asian Paints Limited",
-    "AXISBANK.NS": "Axis Bank Limited",
-    "MARUTI.NS": "Maruti Suzuki India Limited",
-    "HCLTECH.NS": "HCL Technologies Limited",
-}
+# Sorted (lowercased key, symbol, company_name) entries, one for the symbol and one
+# for the name of each company; all keys sharing a prefix form one contiguous run
+search_entries = sorted(
+    (key.lower(), symbol, company_name)
+    for symbol, company_name in COMPANIES.items()
+    for key in (symbol, company_name)
+)
+
+def search_prefix(prefix, limit=None):
+    """Companies whose symbol or name starts with prefix, stopping after `limit` matches"""
+    prefix = prefix.lower()
+    results = []
+    seen = set()  # a company can match through both its symbol and its name
+    
+    # Binary search to the first key >= prefix, then walk the run of matches
+    i = bisect_left(search_entries, (prefix,))
+    while i < len(search_entries) and search_entries[i][0].startswith(prefix):
+        _, symbol, company_name = search_entries[i]
+        if symbol not in seen:
+            seen.add(symbol)
+            results.append({
+                "symbol": symbol,
+                "company": company_name
+            })
+            if limit is not None and len(results) >= limit:
+                break
+        i += 1
+    return results
+
+# Short-lived caches (see market_data.cache_get) so repeated lookups of the same
+# symbol skip Yahoo entirely
+_STOCK_TTL = 30   # seconds, live quote data
+_CHART_TTL = 300  # seconds, chart history
+_stock_cache = {}  # symbol -> (timestamp, stock data)
+_chart_cache = {}  # (symbol, period) -> (timestamp, chart data)
+
+# (divisor, suffix) for each display magnitude
+_SCALES = ((1, ""), (1_000, "K"), (1_000_000, "M"), (1_000_000_000, "B"), (1_000_000_000_000, "T"))
+
+# Largest scale every number of a given bit length reaches. A bit length can
+# straddle one power of 1000 (1000 and 999 both have 10 bits), so _scale then
+# makes a single comparison against the next divisor
+_SCALE_BY_BITS = tuple(
+    max(i for i, (divisor, _) in enumerate(_SCALES) if divisor <= 1 << max(bits - 1, 0))
+    for bits in range(64)
+)
 
-# Initialize Trie and populate it with company data
-company_trie = Trie()
-for symbol, company_name in companies.items():
-    # Insert both symbol and company name into the Trie for searchability
-    company_trie.insert(symbol, symbol, company_name)
-    company_trie.insert(company_name, symbol, company_name)
+def _scale(value, top=len(_SCALES) - 1):
+    """(divisor, suffix) for value, using scales up to index `top`"""
+    if not value >= 1_000:  # also catches negatives and NaN
+        return _SCALES[0]
+    index = _SCALE_BY_BITS[int(value).bit_length() if value < 1 << 63 else 63]
+    if index + 1 < len(_SCALES) and value >= _SCALES[index + 1][0]:
+        index += 1
+    return _SCALES[min(index, top)]
 
 # Format numbers for display
 def format_number(value):
     if value is None:
         return "N/A"
     
-    if value >= 1_000_000_000_000:  # Trillions
-        return f"${value / 1_000_000_000_000:.2f}T"
-    elif value >= 1_000_000_000:  # Billions
-        return f"${value / 1_000_000_000:.2f}B"
-    elif value >= 1_000_000:  # Millions
-        return f"${value / 1_000_000:.2f}M"
-    elif value >= 1_000:  # Thousands
-        return f"${value / 1_000:.2f}K"
-    else:
-        return f"${value:.2f}"
+    divisor, suffix = _scale(value)
+    return f"${value / divisor:.2f}{suffix}" if suffix else f"${value:.2f}"
 
 def format_volume(value):
     if value is None:
         return "N/A"
     
-    if value >= 1_000_000_000:  # Billions
-        return f"{value / 1_000_000_000:.2f}B"
-    elif value >= 1_000_000:  # Millions
-        return f"{value / 1_000_000:.2f}M"
-    elif value >= 1_000:  # Thousands
-        return f"{value / 1_000:.2f}K"
-    else:
-        return f"{value:,}"
+    divisor, suffix = _scale(value, top=3)  # volumes top out at billions
+    return f"{value / divisor:.2f}{suffix}" if suffix else f"{value:,}"
+
+def _fast_info_value(fast_info, name):
+    """A fast_info field, or None when Yahoo has no data for it (the lookups raise)"""
+    try:
+        return getattr(fast_info, name)
+    except Exception:
+        return None
+
+def _history_metadata(ticker):
+    """Metadata from the ticker's last history() call (fast_info makes one), so no extra request"""
+    try:
+        return ticker.get_history_metadata()
+    except Exception:
+        return {}
+
+def _market_state(metadata):
+    """PRE, REGULAR or POST while that trading session is open, else CLOSED (as .info's marketState)"""
+    try:
+        periods = metadata["currentTradingPeriod"]
+    except (KeyError, TypeError):
+        return "CLOSED"
+    now = time.time()
+    for name in ("pre", "regular", "post"):
+        trading = periods.get(name)
+        if trading and trading["start"] <= now < trading["end"]:
+            return name.upper()
+    return "CLOSED"
+
+def _stock_summary(metadata, symbol, current_price, previous_price, volume, market_cap, day_high, day_low):
+    """Stock data dict from already fetched prices; currency and market state come from history metadata"""
+    # Calculate price changes
+    current_price = float(current_price)
+    previous_price = float(previous_price)
+    volume = int(volume)
+    change = current_price - previous_price
+    change_percent = (change / previous_price * 100) if previous_price != 0 else 0
+    
+    return {
+        "symbol": symbol,
+        "company_name": COMPANIES.get(symbol, f"{symbol} Inc."),
+        "current_price": current_price,
+        "change": change,
+        "change_percent": change_percent,
+        "volume": volume,
+        "market_cap": market_cap,
+        "previous_close": previous_price,
+        "day_high": day_high,
+        "day_low": day_low,
+        "currency": metadata.get('currency') or 'USD',
+        "market_state": _market_state(metadata),
+    }
+
+def _stock_data_from_history(symbol, hist, metadata):
+    """
+    Stock data from the last two rows of a chart history that is being fetched anyway
+    Prices are the chart's adjusted Ticker.history bars; only the share count is fetched
+    """
+    last = hist.iloc[-1]
+    current_price = float(last['Close'])
+    # If only one day of data, assume no change
+    previous_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
+    
+    # fast_info's market cap is shares * last price, and its last price would load
+    # another year of history, so multiply by the chart's close instead
+    shares = _fast_info_value(get_ticker(symbol).fast_info, 'shares')
+    high, low = float(last['High']), float(last['Low'])
+    
+    return _stock_summary(
+        metadata, symbol, current_price, previous_price, last['Volume'],
+        market_cap=float(shares * current_price) if shares is not None else None,
+        day_high=None if math.isnan(high) else high,
+        day_low=None if math.isnan(low) else low,
+    )
 
 # Get single stock data
 def get_stock_data(symbol: str):
     """
     Get live stock data for a single symbol
     """
+    cached = cache_get(_stock_cache, symbol, _STOCK_TTL)
+    if cached is not None:
+        return dict(cached)  # callers add formatted fields to the result
+    
     try:
-        ticker = yf.Ticker(symbol)
-        info = ticker.info
+        ticker = get_ticker(symbol)
+        # fast_info reads the chart endpoint instead of the much larger quoteSummary
+        # payload behind .info, and has every field this response uses
+        fast_info = ticker.fast_info
         
-        # Get recent price data
-        hist = ticker.history(period="5d")
-        if hist.empty:
-            raise ValueError("No historical data found")
+        # Last/previous close and volume come from the daily prices fast_info
+        # loads anyway; the 5-day history is only fetched if any are missing
+        current_price = _fast_info_value(fast_info, 'last_price')
+        previous_price = _fast_info_value(fast_info, 'regular_market_previous_close')
+        volume = _fast_info_value(fast_info, 'last_volume')
         
-        # Calculate price changes
-        current_price = float(hist['Close'].iloc[-1])
-        previous_price = float(hist['Close'].iloc[-2]) if len(hist) > 1 else current_price
-        change = current_price - previous_price
-        change_percent = (change / previous_price * 100) if previous_price != 0 else 0
-        
-        # Get volume and market cap
-        volume = int(hist['Volume'].iloc[-1])
-        market_cap = info.get('marketCap')
-        if not market_cap and info.get('sharesOutstanding'):
-            market_cap = info.get('sharesOutstanding') * current_price
+        if current_price is None or previous_price is None or volume is None:
+            hist, metadata = get_history(symbol, "5d", _STOCK_TTL)
+            if hist.empty:
+                raise ValueError("No historical data found")
+            current_price = hist['Close'].iloc[-1]
+            previous_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
+            volume = hist['Volume'].iloc[-1]
+        else:
+            metadata = _history_metadata(ticker)
         
-        return {
-            "symbol": symbol,
-            "company_name": companies.get(symbol, f"{symbol} Inc."),
-            "current_price": current_price,
-            "change": change,
-            "change_percent": change_percent,
-            "volume": volume,
-            "market_cap": market_cap,
-            "previous_close": previous_price,
-            "day_high": info.get('dayHigh'),
-            "day_low": info.get('dayLow'),
-            "currency": info.get('currency', 'USD'),
-            "market_state": info.get('marketState', 'CLOSED'),
-        }
+        stock_data = _stock_summary(
+            metadata, symbol, current_price, previous_price, volume,
+            market_cap=_fast_info_value(fast_info, 'market_cap'),
+            day_high=_fast_info_value(fast_info, 'day_high'),
+            day_low=_fast_info_value(fast_info, 'day_low'),
+        )
+        cache_put(_stock_cache, symbol, stock_data)
+        return dict(stock_data)
         
     except Exception as e:
-        print(f"Error fetching data for {symbol}: {e}")
+        logger.exception("Error fetching data for %s: %s", symbol, e)
         return {
             "symbol": symbol,
-            "company_name": companies.get(symbol, f"{symbol} Inc."),
+            "company_name": COMPANIES.get(symbol, f"{symbol} Inc."),
             "current_price": None,
             "change": None,
             "change_percent": None,
@@ -192,81 +238,176 @@ def get_stock_data(symbol: str):
             "error": str(e)
         }
 
-# Get chart data for single stock with timeframe support
+# Map frontend periods to yfinance periods
+PERIOD_MAPPING = {
+    "1D": "1d", 
+    "1W": "5d", 
+    "1M": "1mo",
+    "3M": "3mo",
+    "6M": "6mo",
+    "1Y": "1y",
+    "2Y": "2y",
+    "5Y": "5y"
+}
+
+def is_intraday(period: str):
+    """1D charts use 5-minute bars; every other period is daily"""
+    # Use mapped period or default to original period parameter
+    return PERIOD_MAPPING.get(period, period) == "1d"
+
+# Fetch price history for a frontend timeframe (1D, 1W, ... 5Y) or a raw yfinance period
+# Returns (history, metadata) from market_data.get_history, shared for _CHART_TTL seconds
+def fetch_chart_history(symbol: str, period: str):
+    # For intraday data (1D), use different interval
+    if is_intraday(period):
+        return get_history(symbol, "1d", _CHART_TTL, interval="5m")  # 5-minute intervals for 1 day
+    return get_history(symbol, PERIOD_MAPPING.get(period, period), _CHART_TTL)
+
+# Get chart data for single stock with timeframe support.
+# Returns the chart points and their rounded closes as an ndarray for statistics.
 def get_chart_data(symbol: str, period: str = "3mo"):
+    _note_demand(symbol, period)
+    cached = cache_get(_chart_cache, (symbol, period), _CHART_TTL)
+    if cached is not None:
+        return cached
+    
     try:
-        ticker = yf.Ticker(symbol)
-        
-        # Map frontend periods to yfinance periods
-        period_mapping = {
-            "1D": "1d", 
-            "1W": "5d", 
-            "1M": "1mo",
-            "3M": "3mo",
-            "6M": "6mo",
-            "1Y": "1y",
-            "2Y": "2y",
-            "5Y": "5y"
-        }
-        
-        # Use mapped period or default to original period parameter
-        yf_period = period_mapping.get(period, period)
-        
-        # For intraday data (1D), use different interval
-        if period == "1D" or yf_period == "1d":
-            hist = ticker.history(period="1d", interval="5m")  # 5-minute intervals for 1 day
-        else:
-            hist = ticker.history(period=yf_period)
+        hist, _ = fetch_chart_history(symbol, period)
         
         if hist.empty:
-            return []
-        
-        chart_data = []
-        for date, row in hist.iterrows():
-            # Handle timezone-aware datetime for intraday data
-            if hasattr(date, 'tz_localize'):
-                date_str = date.strftime("%Y-%m-%d %H:%M")
-            else:
-                date_str = date.strftime("%Y-%m-%d")
-                
-            chart_data.append({
-                "date": date_str,
-                "open": round(row['Open'], 2),
-                "close": round(row['Close'], 2),
-                "high": round(row['High'], 2),
-                "low": round(row['Low'], 2),
-                "volume": int(row['Volume']) if not pd.isna(row['Volume']) else 0
-            })
+            return [], np.empty(0)
         
-        return chart_data
+        chart = build_chart_data(hist)
+        cache_put(_chart_cache, (symbol, period), chart)
+        return chart
         
     except Exception as e:
-        print(f"Error fetching chart data for {symbol} with period {period}: {e}")
-        return []
+        logger.exception("Error fetching chart data for %s with period %s: %s", symbol, period, e)
+        return [], np.empty(0)
+
+# Chart points and their rounded closes from a non-empty history DataFrame
+def build_chart_data(hist):
+    # Round and format whole columns at once instead of building a Series per row
+    dates = hist.index.strftime("%Y-%m-%d %H:%M").tolist()
+    opens = np.round(hist['Open'].to_numpy(), 2).tolist()
+    closes = np.round(hist['Close'].to_numpy(), 2)
+    highs = np.round(hist['High'].to_numpy(), 2).tolist()
+    lows = np.round(hist['Low'].to_numpy(), 2).tolist()
+    volumes = hist['Volume'].fillna(0).to_numpy(dtype=np.int64).tolist()
+    
+    chart_data = [
+        {"date": date, "open": o, "close": c, "high": h, "low": l, "volume": v}
+        for date, o, c, h, l, v in zip(dates, opens, closes.tolist(), highs, lows, volumes)
+    ]
+    return chart_data, closes
+
+# Get stock data and chart points for one stock page from a single history request.
+# A daily chart already holds the latest two closes, so on a chart cache miss the
+# quote is derived from it instead of fetching fast_info's own year of prices.
+# Intraday (1D) charts, and histories too short for a previous close, fall back to get_stock_data.
+def get_stock_and_chart(symbol: str, period: str = "3mo"):
+    _note_demand(symbol, period)
+    stock_data = cache_get(_stock_cache, symbol, _STOCK_TTL)
+    chart = cache_get(_chart_cache, (symbol, period), _CHART_TTL)
+    
+    if chart is None:
+        chart = [], np.empty(0)
+        try:
+            hist, metadata = fetch_chart_history(symbol, period)
+            
+            if not hist.empty:
+                chart = build_chart_data(hist)
+                cache_put(_chart_cache, (symbol, period), chart)
+                
+                if stock_data is None and not is_intraday(period) and len(hist) > 1:
+                    stock_data = _stock_data_from_history(symbol, hist, metadata)
+                    cache_put(_stock_cache, symbol, stock_data)
+        except Exception as e:
+            logger.exception("Error fetching chart data for %s with period %s: %s", symbol, period, e)
+    
+    if stock_data is None:
+        return get_stock_data(symbol), chart
+    return dict(stock_data), chart  # callers add formatted fields to the result
+
+# Default-period charts are prefetched from batched downloads: every listed company
+# once at startup, so first visits skip the Yahoo round trip, then once per
+# _CHART_TTL only those requested since the last pass, so they stay cached while in
+# demand and an idle server downloads nothing. Quotes need per-ticker metadata
+# (currency, market state, shares), so they are still fetched on demand.
+WARM_PERIOD = "3M"
+_warm_demand = set()  # symbols whose WARM_PERIOD chart was requested since the last pass
+_warm_lock = threading.Lock()
+
+def _note_demand(symbol, period):
+    if period == WARM_PERIOD and symbol in COMPANIES:
+        with _warm_lock:
+            _warm_demand.add(symbol)
+
+def _warm_chart_chunk(chunk):
+    hist_all = download_chunk(chunk, PERIOD_MAPPING[WARM_PERIOD])
+    if hist_all is None:
+        return
+    
+    for symbol in hist_all.columns.unique(level=0):
+        # Rows are the union of all markets' trading days; drop the ones this symbol did not trade
+        hist = hist_all[symbol].dropna(how="all")
+        if not hist.empty:
+            cache_put(_chart_cache, (symbol, WARM_PERIOD), build_chart_data(hist))
+
+async def warm_chart_cache():
+    symbols = list(COMPANIES)  # the first pass, at startup, covers every listed company
+    while True:
+        for chunk in chunked(symbols):
+            try:
+                await asyncio.to_thread(_warm_chart_chunk, chunk)
+            except Exception as e:
+                logger.warning("Error warming chart cache: %s", e)
+        
+        await asyncio.sleep(_CHART_TTL)
+        with _warm_lock:
+            symbols = sorted(_warm_demand)
+            _warm_demand.clear()
+
+# Yield chart points one NDJSON line at a time, so only the column arrays are
+# held in memory rather than a dict per point plus the encoded payload
+def iter_chart_rows(hist):
+    dates = hist.index.strftime("%Y-%m-%d %H:%M")
+    opens = np.round(hist['Open'].to_numpy(), 2)
+    closes = np.round(hist['Close'].to_numpy(), 2)
+    highs = np.round(hist['High'].to_numpy(), 2)
+    lows = np.round(hist['Low'].to_numpy(), 2)
+    volumes = hist['Volume'].fillna(0).to_numpy(dtype=np.int64)
+    
+    for date, o, c, h, l, v in zip(dates, opens, closes, highs, lows, volumes):
+        point = {"date": date, "open": o, "close": c, "high": h, "low": l, "volume": v}
+        yield orjson.dumps(point, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+
+# Reject symbols outside COMPANIES before spending a Yahoo round-trip on them;
+# allow_unlisted=true lets callers look up any ticker Yahoo knows
+def check_listed(symbol: str, allow_unlisted: bool):
+    if not allow_unlisted and symbol not in COMPANIES:
+        raise HTTPException(status_code=400, detail=f"Unknown symbol {symbol}")
 
 # API Endpoints
 
 @app.get("/search")
-# Search for companies using Trie data structure for efficient prefix matching.
-# Time Complexity: O(m + n) where m is query length and n is number of matching results.
+# Search for companies using binary search over the sorted entries for prefix matching.
+# Time Complexity: O(m log N + k) where m is query length, N the number of entries and k the results returned.
 def search_companies(query: str):
-    results = company_trie.search_prefix(query)
-    return results[:10]  # Limit to 10 results
+    return search_prefix(query, limit=10)  # Stop the walk at 10 results
 
 @app.get("/stock/{symbol}")
-def get_stock_info(symbol: str, period: str = "3M"):
+def get_stock_info(symbol: str, period: str = "3M", allow_unlisted: bool = False):
     try:
         symbol = symbol.upper()
+        check_listed(symbol, allow_unlisted)
         
-        # Get stock data
-        stock_data = get_stock_data(symbol)
+        # Get stock data and chart data with specified period from one history fetch
+        stock_data, (chart_data, _) = get_stock_and_chart(symbol, period)
         
         if stock_data["current_price"] is None:
             raise HTTPException(status_code=404, detail=f"Stock data not found for {symbol}")
         
-        # Get chart data with specified period
-        chart_data = get_chart_data(symbol, period)
-        
         # Add formatted values
         stock_data["formatted_market_cap"] = format_number(stock_data["market_cap"])
         stock_data["formatted_volume"] = format_volume(stock_data["volume"])
@@ -283,24 +424,43 @@ def get_stock_info(symbol: str, period: str = "3M"):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in stock endpoint: {e}")
+        logger.exception("Error in stock endpoint: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Declared before /chart/{symbol}, whose path parameter would otherwise match "AAPL.ndjson"
+@app.get("/chart/{symbol}.ndjson")
+def stream_chart_data(symbol: str, period: str = "3M", allow_unlisted: bool = False):
+    """Chart points as newline-delimited JSON, for long periods such as 5Y"""
+    symbol = symbol.upper()
+    check_listed(symbol, allow_unlisted)
+    
+    try:
+        hist, _ = fetch_chart_history(symbol, period)
+    except Exception as e:
+        logger.exception("Error in chart stream endpoint: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if hist.empty:
+        raise HTTPException(status_code=404, detail=f"No chart data found for {symbol} with period {period}")
+    
+    return StreamingResponse(iter_chart_rows(hist), media_type="application/x-ndjson")
 
 @app.get("/chart/{symbol}")
-def get_chart_info(symbol: str, period: str = "3M"):
+def get_chart_info(symbol: str, period: str = "3M", allow_unlisted: bool = False):
     try:
         symbol = symbol.upper()
+        check_listed(symbol, allow_unlisted)
         
         # Get chart data with specified period
-        chart_data = get_chart_data(symbol, period)
+        chart_data, closes = get_chart_data(symbol, period)
         
         if not chart_data:
             raise HTTPException(status_code=404, detail=f"No chart data found for {symbol} with period {period}")
         
-        # Calculate some basic statistics
-        prices = [item['close'] for item in chart_data]
-        price_change = prices[-1] - prices[0] if len(prices) > 1 else 0
-        price_change_percent = (price_change / prices[0] * 100) if prices[0] != 0 else 0
+        # Calculate some basic statistics on the closes array
+        first_price, last_price = float(closes[0]), float(closes[-1])
+        price_change = last_price - first_price if len(closes) > 1 else 0
+        price_change_percent = (price_change / first_price * 100) if first_price != 0 else 0
         
         return {
             "success": True,
@@ -310,15 +470,15 @@ def get_chart_info(symbol: str, period: str = "3M"):
             "data_points": len(chart_data),
             "period_change": round(price_change, 2),
             "period_change_percent": round(price_change_percent, 2),
-            "period_high": round(max(prices), 2),
-            "period_low": round(min(prices), 2),
+            "period_high": round(float(closes.max()), 2),
+            "period_low": round(float(closes.min()), 2),
             "timestamp": datetime.now().isoformat()
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in chart endpoint: {e}")
+        logger.exception("Error in chart endpoint: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/")
@@ -335,6 +495,7 @@ def root():
             "search": "/search?query=apple",
             "stock_info": "/stock/AAPL?period=3M",
             "chart_data": "/chart/AAPL?period=1Y",
+            "chart_stream": "/chart/AAPL.ndjson?period=5Y",
             "examples": {
                 "daily_data": "/stock/AAPL?period=1D",
                 "weekly_data": "/stock/AAPL?period=1W", 
@@ -346,4 +507,4 @@ def root():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8001)  # SearchTab calls 8001
\ No newline at end of file
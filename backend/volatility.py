@@ -1,14 +1,23 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
+from fastapi.responses import ORJSONResponse
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from typing import List, Dict
 from datetime import datetime, timedelta
 import math
+import heapq
+import asyncio
+import logging
+from companies import COMPANIES
+from market_data import cache_get, cache_put, chunked, download_chunk, get_history
+
+logger = logging.getLogger(__name__)
 
 # Initialize FastAPI application
-app = FastAPI(title="Stock Volatility API", version="1.0.0")
+# ORJSONResponse encodes the volatility data points in native code instead of the stdlib json module
+app = FastAPI(title="Stock Volatility API", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Enable CORS for React frontend
 app.add_middleware(
@@ -19,46 +28,66 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Company symbols (consistent with other backend files)
-COMPANIES = {
-    "AAPL": "Apple Inc.",
-    "MSFT": "Microsoft Corporation", 
-    "GOOGL": "Alphabet Inc.",
-    "AMZN": "Amazon.com Inc.",
-    "TSLA": "Tesla Inc.",
-    "META": "Meta Platforms Inc.",
-    "NVDA": "NVIDIA Corporation",
-    "JPM": "JPMorgan Chase & Co.",
-    "JNJ": "Johnson & Johnson",
-    "V": "Visa Inc.",
-    "BRK-B": "Berkshire Hathaway Inc.",
-    "UNH": "UnitedHealth Group Incorporated",
-    "XOM": "Exxon Mobil Corporation",
-    "WMT": "Walmart Inc.",
-    "PG": "The Procter & Gamble Company",
-    "RELIANCE.NS": "Reliance Industries Limited",
-    "TCS.NS": "Tata Consultancy Services Limited",
-    "HDFCBANK.NS": "HDFC Bank Limited",
-    "INFY.NS": "Infosys Limited",
-    "ICICIBANK.NS": "ICICI Bank Limited",
-    "INTC": "Intel Corporation"
-}
-
-def calculate_returns(prices: pd.Series) -> pd.Series:
-    """Calculate daily returns from price series"""
-    return prices.pct_change().dropna()
-
-def calculate_volatility(returns: pd.Series, trading_days: int = 252) -> float:
+def _download_chunk(chunk: List[str], period: str):
+    """One batched download, or None if it failed or came back empty"""
+    try:
+        return download_chunk(chunk, period)
+    except Exception as e:
+        logger.warning("Error downloading %s: %s", ", ".join(chunk), e)
+        return None
+
+def fetch_bulk_history(symbols: List[str], period: str) -> pd.DataFrame:
+    """
+    Daily history for many symbols, one batched yf.download per BATCH_SIZE symbols
+    The chunks run one after another: yf.download keeps its results in
+    module-level state that every call resets, so calls must not overlap
+    Returns a DataFrame with (symbol, field) MultiIndex columns, empty if nothing came back
+    """
+    frames = []
+    for chunk in chunked(symbols):
+        hist = _download_chunk(chunk, period)
+        if hist is not None:
+            frames.append(hist)
+    
+    if not frames:
+        return pd.DataFrame()
+    # Sort explicitly: calculate_bulk_volatility needs the union of every
+    # market's trading dates in date order
+    return pd.concat(frames, axis=1).sort_index()
+
+# Trading days per year, and the factor turning a daily standard deviation into
+# an annualized percentage, computed once instead of on every call
+TRADING_DAYS = 252
+_ANNUAL_PCT = math.sqrt(TRADING_DAYS) * 100
+
+def calculate_returns(prices: np.ndarray) -> np.ndarray:
+    """Calculate daily returns from price array, one fewer than there are prices"""
+    return prices[1:] / prices[:-1] - 1.0
+
+def calculate_volatility(returns: np.ndarray, trading_days: int = TRADING_DAYS) -> float:
     """Calculate annualized volatility using standard deviation"""
     if len(returns) < 2:
         return 0.0
-    daily_vol = returns.std()
-    annual_vol = daily_vol * math.sqrt(trading_days)
-    return round(annual_vol * 100, 2)
+    daily_vol = float(returns.std(ddof=1))
+    annual_pct = _ANNUAL_PCT if trading_days == TRADING_DAYS else math.sqrt(trading_days) * 100
+    return round(daily_vol * annual_pct, 2)
 
-def calculate_rolling_volatility(returns: pd.Series, window: int = 21) -> pd.Series:
-    """Calculate rolling volatility"""
-    return returns.rolling(window=window).std() * math.sqrt(252) * 100
+def calculate_rolling_volatility(returns: np.ndarray, window: int = 21) -> np.ndarray:
+    """Calculate rolling volatility, one value per full window (len(returns) - window + 1)"""
+    return sliding_window_view(returns, window).std(axis=1, ddof=1) * _ANNUAL_PCT
+
+def calculate_bulk_volatility(closes: np.ndarray):
+    """
+    Annualized volatility of every column of a (dates x symbols) close matrix in one pass
+    NaN gaps, the days a symbol's market was closed, are skipped per column like dropna
+    Returns arrays of (volatility %, last close), one entry per column
+    """
+    # A stable sort on the validity mask moves each column's closes to the
+    # bottom in date order, so consecutive rows are consecutive trading days
+    order = np.argsort(~np.isnan(closes), axis=0, kind="stable")
+    packed = np.take_along_axis(closes, order, axis=0)
+    returns = packed[1:] / packed[:-1] - 1.0  # NaN wherever the pair reaches into the gap
+    return np.nanstd(returns, axis=0, ddof=1) * _ANNUAL_PCT, packed[-1]
 
 def get_risk_level(volatility: float) -> str:
     """Categorize risk level based on volatility"""
@@ -85,22 +114,29 @@ async def root():
     """API health check"""
     return {"message": "Volatility API is running!", "status": "active"}
 
-@app.get("/api/volatility/{symbol}")
-async def get_volatility_data(symbol: str, time_range: str = "1M"):
-    """Get volatility analysis for a specific stock"""
+# Volatility results are reused for _CACHE_TTL seconds per (symbol, time_range)
+_CACHE_TTL = 300
+_cache = {}  # (symbol, time_range) -> (timestamp, result)
+
+def compute_volatility(symbol: str, time_range: str = "1M"):
+    """Volatility analysis for one stock; blocking, raises HTTPException on failure"""
+    symbol = symbol.upper()
+    key = (symbol, time_range)
+    cached = cache_get(_cache, key, _CACHE_TTL)
+    if cached is not None:
+        return cached
+    
     try:
-        symbol = symbol.upper()
         period = get_time_period(time_range)
         
         # Fetch stock data
-        ticker = yf.Ticker(symbol)
-        hist = ticker.history(period=period)
+        hist, _ = get_history(symbol, period, _CACHE_TTL)
         
         if hist.empty:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
         
         # Calculate volatility metrics
-        closing_prices = hist['Close']
+        closing_prices = hist['Close'].to_numpy(dtype=np.float64)
         returns = calculate_returns(closing_prices)
         
         if len(returns) < 2:
@@ -109,27 +145,27 @@ async def get_volatility_data(symbol: str, time_range: str = "1M"):
         historical_volatility = calculate_volatility(returns)
         
         # Calculate rolling volatility for chart
-        rolling_vol = calculate_rolling_volatility(returns, window=min(21, len(returns)))
-        
-        # Create data points for visualization
-        data_points = []
-        if not rolling_vol.empty:
-            for date, vol in rolling_vol.dropna().items():
-                data_points.append({
-                    "date": date.strftime("%Y-%m-%d"),
-                    "volatility": round(vol, 2)
-                })
+        window = min(21, len(returns))
+        vols = calculate_rolling_volatility(returns, window=window)
+        
+        # Create data points for visualization, rounding and formatting whole columns at once.
+        # Each window ends on the close `window` days after the first price
+        dates = hist.index[window:].strftime("%Y-%m-%d").tolist()
+        data_points = [
+            {"date": date, "volatility": vol}
+            for date, vol in zip(dates, np.round(vols, 2).tolist())
+        ]
         
         # Calculate statistics
-        max_vol = round(rolling_vol.max(), 2) if not rolling_vol.empty else historical_volatility
-        min_vol = round(rolling_vol.min(), 2) if not rolling_vol.empty else historical_volatility
-        avg_vol = round(rolling_vol.mean(), 2) if not rolling_vol.empty else historical_volatility
+        max_vol = round(float(vols.max()), 2) if len(vols) else historical_volatility
+        min_vol = round(float(vols.min()), 2) if len(vols) else historical_volatility
+        avg_vol = round(float(vols.mean()), 2) if len(vols) else historical_volatility
         
         # Get current price and company info
-        current_price = round(float(closing_prices.iloc[-1]), 2)
+        current_price = round(float(closing_prices[-1]), 2)
         company_name = COMPANIES.get(symbol, symbol)
         
-        return {
+        result = {
             "symbol": symbol,
             "company_name": company_name,
             "current_price": current_price,
@@ -144,42 +180,53 @@ async def get_volatility_data(symbol: str, time_range: str = "1M"):
             "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
         
+        cache_put(_cache, key, result)
+        return result
+        
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating volatility: {str(e)}")
 
+@app.get("/api/volatility/{symbol}")
+async def get_volatility_data(symbol: str, time_range: str = "1M"):
+    """Get volatility analysis for a specific stock"""
+    # yfinance blocks, so run it in a worker thread to keep the event loop serving other requests
+    return await asyncio.to_thread(compute_volatility, symbol, time_range)
+
 @app.get("/api/volatility-ranking")
 async def get_volatility_ranking(time_range: str = "1M", limit: int = 10):
     """Get stocks ranked by volatility"""
     try:
         all_volatilities = []
         
-        for symbol in COMPANIES.keys():
-            try:
-                period = get_time_period(time_range)
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period=period)
-                
-                if not hist.empty and len(hist) > 5:
-                    closing_prices = hist['Close']
-                    returns = calculate_returns(closing_prices)
-                    volatility = calculate_volatility(returns)
-                    
-                    all_volatilities.append({
-                        "symbol": symbol,
-                        "company_name": COMPANIES[symbol],
-                        "volatility": volatility,
-                        "risk_level": get_risk_level(volatility),
-                        "current_price": round(float(closing_prices.iloc[-1]), 2)
-                    })
-            except Exception as e:
-                print(f"Error processing {symbol}: {e}")
-                continue
+        # One batched download for every company instead of a request per symbol
+        symbols = list(COMPANIES)
+        hist_all = await asyncio.to_thread(fetch_bulk_history, symbols, get_time_period(time_range))
+        
+        if not hist_all.empty:
+            # Rows are the union of all markets' trading days; symbols missing
+            # from the download come back as all-NaN columns
+            closes = hist_all.xs("Close", axis=1, level=1).reindex(columns=symbols).to_numpy(dtype=np.float64)
+            
+            # Only symbols with more than 5 closes, all computed in one NumPy pass
+            keep = np.flatnonzero((~np.isnan(closes)).sum(axis=0) > 5)
+            volatilities, last_close = calculate_bulk_volatility(closes[:, keep])
+            
+            for i, vol, price in zip(keep, volatilities.tolist(), last_close.tolist()):
+                symbol = symbols[i]
+                volatility = round(vol, 2)
+                all_volatilities.append({
+                    "symbol": symbol,
+                    "company_name": COMPANIES[symbol],
+                    "volatility": volatility,
+                    "risk_level": get_risk_level(volatility),
+                    "current_price": round(price, 2)
+                })
         
-        # Sort by volatility
-        most_volatile = sorted(all_volatilities, key=lambda x: x["volatility"], reverse=True)[:limit]
-        least_volatile = sorted(all_volatilities, key=lambda x: x["volatility"])[:limit]
+        # Top `limit` each way with a bounded heap, O(n log limit) instead of two full sorts
+        most_volatile = heapq.nlargest(limit, all_volatilities, key=lambda x: x["volatility"])
+        least_volatile = heapq.nsmallest(limit, all_volatilities, key=lambda x: x["volatility"])
         
         return {
             "time_range": time_range,
@@ -196,15 +243,19 @@ async def compare_volatility(symbols: str, time_range: str = "1M"):
     """Compare volatility between multiple stocks"""
     try:
         symbol_list = [s.strip().upper() for s in symbols.split(",")]
-        comparisons = []
         
-        for symbol in symbol_list:
-            try:
-                volatility_response = await get_volatility_data(symbol, time_range)
-                comparisons.append(volatility_response)
-            except Exception as e:
-                print(f"Error processing {symbol}: {e}")
+        # Analyse all symbols concurrently in worker threads
+        results = await asyncio.gather(
+            *(asyncio.to_thread(compute_volatility, symbol, time_range) for symbol in symbol_list),
+            return_exceptions=True
+        )
+        
+        comparisons = []
+        for symbol, result in zip(symbol_list, results):
+            if isinstance(result, Exception):
+                logger.warning("Error processing %s: %s", symbol, result)
                 continue
+            comparisons.append(result)
         
         # Sort by volatility for comparison
         comparisons.sort(key=lambda x: x["historical_volatility"], reverse=True)
@@ -221,4 +272,4 @@ async def compare_volatility(symbols: str, time_range: str = "1M"):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8001, reload=True)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8003, reload=True)  # VolatilityTab calls 8003
\ No newline at end of file